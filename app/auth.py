@@ -18,14 +18,15 @@ async def verify_api_key(
     Raises 401 if the token is missing or does not match.
     """
     settings = get_settings()
-    expected = settings.get_api_key_str()
+    expected = settings.get_api_key_bytes()
     if not expected:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="GEOLOGY_ENGINE_API_KEY is not configured",
         )
 
-    if not hmac.compare_digest(credentials.credentials, expected):
+    # Compare bytes: constant-time, and safe for non-ASCII tokens
+    if not hmac.compare_digest(credentials.credentials.encode(), expected):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
@@ -0,0 +1,57 @@
+"""
+Thread offloading for CPU-bound RBF work.
+
+Fitting and evaluating release the GIL inside ferreus_rbf / LAPACK, so they
+run in parallel on worker threads. They share a limiter sized to the CPU
+count rather than the default 40-thread pool, so a burst of RBF requests
+queues instead of oversubscribing the cores, and never starves the threads
+the rest of the app uses for sync dependencies.
+"""
+
+import logging
+import os
+from typing import Any, Callable, TypeVar
+
+import anyio.to_thread
+from anyio import CapacityLimiter
+from anyio.lowlevel import RunVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _web_concurrency() -> int:
+    """uvicorn worker count from WEB_CONCURRENCY; empty or invalid values give 1."""
+    raw = os.getenv("WEB_CONCURRENCY", "").strip()
+    if not raw:
+        return 1
+    try:
+        workers = int(raw)
+    except ValueError:
+        logger.warning("Ignoring invalid WEB_CONCURRENCY=%r, assuming 1 worker", raw)
+        return 1
+    return max(1, workers)
+
+
+# At most one RBF job per CPU at a time, shared out across uvicorn worker
+# processes (uvicorn takes its worker count from WEB_CONCURRENCY)
+_RBF_THREAD_LIMIT = max(1, (os.cpu_count() or 1) // _web_concurrency())
+
+# The limiter is created on first use inside the running event loop (older
+# anyio releases cannot build one without a loop), one per loop
+_rbf_limiter: RunVar[CapacityLimiter] = RunVar("_rbf_limiter")
+
+
+def _get_rbf_limiter() -> CapacityLimiter:
+    try:
+        return _rbf_limiter.get()
+    except LookupError:
+        limiter = CapacityLimiter(_RBF_THREAD_LIMIT)
+        _rbf_limiter.set(limiter)
+        return limiter
+
+
+async def run_rbf_in_threadpool(func: Callable[..., T], *args: Any) -> T:
+    """Run a CPU-bound RBF call on a worker thread, bounded by the CPU count."""
+    return await anyio.to_thread.run_sync(func, *args, limiter=_get_rbf_limiter())
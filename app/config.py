@@ -1,12 +1,12 @@
 """Application settings loaded from environment (and optional .env file)."""
 
+import os
+from functools import lru_cache
+
 from dotenv import load_dotenv
-from pydantic import Field, SecretStr
+from pydantic import Field, PrivateAttr, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-# Load .env file into environment if present (no-op if not found)
-load_dotenv()
-
 
 class Settings(BaseSettings):
     """Validated config from env. Use get_settings() to access."""
@@ -24,17 +24,36 @@ class Settings(BaseSettings):
         description="Shared API key sent by callers as a Bearer token",
     )
 
+    # Directory (ideally tmpfs, e.g. /dev/shm) where fitted RBF models are
+    # shared between worker processes. Unset: each worker keeps its own.
+    rbf_model_cache_dir: str | None = Field(
+        default=None,
+        description="Directory for sharing fitted RBF models across workers",
+    )
+
+    # UTF-8 encoded API key, computed on first use by get_api_key_bytes()
+    _api_key_bytes: bytes | None = PrivateAttr(default=None)
+
     def get_api_key_str(self) -> str:
         """Return the raw key value. Never log this."""
         return self.geology_engine_api_key.get_secret_value()
 
-
-_settings: Settings | None = None
+    def get_api_key_bytes(self) -> bytes:
+        """Return the raw key as UTF-8 bytes, encoded once. Never log this."""
+        if self._api_key_bytes is None:
+            self._api_key_bytes = self.get_api_key_str().encode()
+        return self._api_key_bytes
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Cached settings instance. Fails at first use if env is invalid."""
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+    """Cached settings instance. Fails at first use if env is invalid.
+
+    Reads ``.env`` on first call unless ``LOAD_DOTENV=0`` (set in containers,
+    where the environment is injected and there is no file to look for).
+    """
+    if os.getenv("LOAD_DOTENV", "1") == "1":
+        # Load .env file into environment if present (no-op if not found)
+        load_dotenv()
+        return Settings()
+    return Settings(_env_file=None)
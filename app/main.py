@@ -1,19 +1,34 @@
 import numpy as np
-from fastapi import Depends, FastAPI, HTTPException
-from pydantic import BaseModel, ConfigDict, Field
+from fastapi import Depends, FastAPI, Header, HTTPException, Response
+from pydantic import BaseModel, Field
 
 from app.auth import verify_api_key
+from app.concurrency import run_rbf_in_threadpool
+from app.config import get_settings
+from app.rbf_direct import fit_and_evaluate_linear_rbf, use_direct_solver
 from app.rbf_models import (
     RBFCoefficientsRequest,
     RBFCoefficientsResponse,
     RBFEvaluateRequest,
+    RBFEvaluateRequestV2,
     RBFEvaluateResponse,
+    RBFRequest,
+    RBFResponse,
 )
 from app.rbf_service import (
+    evaluate_arrays_at_query_points,
     evaluate_at_query_points,
     extract_coefficients,
+    extract_coefficients_raw,
     fit_rbf_from_intervals,
 )
+from app.serialization import (
+    MSGPACK_MEDIA_TYPE,
+    MsgPackResponse,
+    NumpyJSONResponse,
+    ORJSONRoute,
+    wants_msgpack,
+)
 from ferreus_rbf import RBFInterpolator
 from ferreus_rbf.interpolant_config import InterpolantSettings, RBFKernelType
 
@@ -22,6 +37,11 @@ app = FastAPI(
     version="0.1.0",
     description="FastAPI service for geological data processing and RBF interpolation",
 )
+# Parse JSON request bodies with orjson on every route registered below
+app.router.route_class = ORJSONRoute
+
+# Linear-kernel settings for /rbf/interpolate, shared read-only across requests
+_LINEAR_SETTINGS = InterpolantSettings(RBFKernelType.Linear)
 
 
 class RootResponse(BaseModel):
@@ -38,50 +58,6 @@ class HealthResponse(BaseModel):
     service: str = Field(..., description="Name of the service")
 
 
-class RBFRequest(BaseModel):
-    """Request model for RBF interpolation."""
-
-    training_points: list[list[float]] = Field(
-        ...,
-        description="N x D array of training point coordinates (e.g., [[x1, y1], [x2, y2], ...])",
-    )
-    training_values: list[float] = Field(
-        ...,
-        description="N values corresponding to each training point",
-    )
-    test_points: list[list[float]] = Field(
-        ...,
-        description="M x D array of test point coordinates where values should be interpolated",
-    )
-
-    model_config = ConfigDict(
-        json_schema_extra={
-            "example": {
-                "training_points": [[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
-                "training_values": [0.0, 1.0, 1.0, 2.0],
-                "test_points": [[0.5, 0.5]],
-            }
-        }
-    )
-
-
-class RBFResponse(BaseModel):
-    """Response model for RBF interpolation."""
-
-    interpolated_values: list[float] = Field(
-        ...,
-        description="M interpolated values at the test point locations",
-    )
-
-    model_config = ConfigDict(
-        json_schema_extra={
-            "example": {
-                "interpolated_values": [1.0],
-            }
-        }
-    )
-
-
 @app.get("/", response_model=RootResponse)
 async def root():
     """Root endpoint returning service information and documentation link."""
@@ -118,12 +94,12 @@ async def rbf_interpolate(request: RBFRequest):
         Test: [[0.5, 0.5]]
         Result: Interpolated value at (0.5, 0.5)
     """
-    # Convert to numpy arrays
-    training_points = np.array(request.training_points, dtype=np.float64)
-    test_points = np.array(request.test_points, dtype=np.float64)
+    # Arrays are already float64 ndarrays (converted during request validation)
+    training_points = request.training_points
+    test_points = request.test_points
 
     # Validate input dimensions (before reshaping values)
-    if training_points.shape[0] != len(request.training_values):
+    if training_points.shape[0] != request.training_values.shape[0]:
         raise HTTPException(
             status_code=422,
             detail="Number of training points must match number of training values"
@@ -136,29 +112,51 @@ async def rbf_interpolate(request: RBFRequest):
         )
 
     # Reshape training values to 2D (required by ferreus_rbf)
-    training_values = np.array(request.training_values, dtype=np.float64).reshape(-1, 1)
-
-    # Configure RBF interpolator with Linear kernel
-    settings = InterpolantSettings(RBFKernelType.Linear)
-
-    # Create and train interpolator
-    rbf = RBFInterpolator(training_points, training_values, settings)
+    training_values = request.training_values.reshape(-1, 1)
+
+    interpolated = None
+    if use_direct_solver(training_points.shape[0], test_points.shape[0]):
+        # Small problem: solve the linear RBF directly, skipping ferreus_rbf
+        try:
+            interpolated = await run_rbf_in_threadpool(
+                fit_and_evaluate_linear_rbf,
+                training_points,
+                training_values,
+                test_points,
+            )
+        except np.linalg.LinAlgError:
+            # Singular system (e.g. duplicate points): let ferreus_rbf handle it
+            interpolated = None
+
+    if interpolated is None:
+        # Create and train interpolator (CPU-bound, run off the event loop)
+        rbf = await run_rbf_in_threadpool(
+            RBFInterpolator, training_points, training_values, _LINEAR_SETTINGS
+        )
 
-    # Evaluate at test points
-    interpolated = rbf.evaluate(test_points)
+        # Evaluate at test points
+        interpolated = await run_rbf_in_threadpool(rbf.evaluate, test_points)
 
-    # Extract values (interpolated is N x 1, we want just the values)
-    if interpolated.ndim == 2:
-        values = interpolated[:, 0].tolist()
-    else:
-        values = interpolated.tolist()
+    # Extract values (ferreus_rbf always returns M x K; K is 1 here)
+    values = interpolated[:, 0]
 
-    return RBFResponse(interpolated_values=values)
+    # orjson serializes the ndarray directly, no .tolist() copy
+    return NumpyJSONResponse({"interpolated_values": values})
 
 
-@app.post("/rbf/coefficients", response_model=RBFCoefficientsResponse)
+@app.post(
+    "/rbf/coefficients",
+    response_model=RBFCoefficientsResponse,
+    responses={
+        200: {
+            "content": {MSGPACK_MEDIA_TYPE: {}},
+            "description": "JSON by default, MessagePack when requested via Accept",
+        }
+    },
+)
 async def rbf_coefficients(
     request: RBFCoefficientsRequest,
+    accept: str | None = Header(default=None),
     _: None = Depends(verify_api_key),
 ):
     """
@@ -168,6 +166,10 @@ async def rbf_coefficients(
     This is more compact than sending pre-rendered geometry and allows
     the client to evaluate the function at arbitrary points locally.
 
+    Send ``Accept: application/x-msgpack`` to receive the same fields as
+    MessagePack (arrays as nested lists of float64), which is smaller and
+    faster to decode than JSON for large models.
+
     Requires a valid API key.
 
     Example:
@@ -176,29 +178,31 @@ async def rbf_coefficients(
     """
     try:
         # Fit RBF model from intervals
-        rbf_interpolator, extents = fit_rbf_from_intervals(
+        rbf_interpolator, extents = await run_rbf_in_threadpool(
+            fit_rbf_from_intervals,
             request.intervals,
             request.fitting_accuracy,
+            get_settings().rbf_model_cache_dir,
         )
 
         # Extract coefficients from the fitted model
-        model_data = extract_coefficients(rbf_interpolator)
+        model_data = await run_rbf_in_threadpool(
+            extract_coefficients, rbf_interpolator
+        )
 
         # Build response from extracted model data
         # Note: ferreus_rbf saves arrays as dicts with 'data' field (flat array)
         def extract_array(array_dict):
-            """Extract and reshape list from ferreus_rbf array dict format."""
+            """Extract and reshape array from ferreus_rbf array dict format."""
             if isinstance(array_dict, dict) and "data" in array_dict:
                 nrows = array_dict.get("nrows", 1)
                 ncols = array_dict.get("ncols", 1)
-                data = array_dict["data"]
-
-                # Reshape flat array to 2D (always return 2D structure)
-                reshaped = []
-                for i in range(nrows):
-                    row = data[i * ncols : (i + 1) * ncols]
-                    reshaped.append(row)
-                return reshaped
+
+                # Reshape flat array to 2D in one NumPy call (always return 2D
+                # structure); the ndarray is serialized directly by orjson
+                return np.asarray(array_dict["data"], dtype=np.float64).reshape(
+                    nrows, ncols
+                )
             return array_dict
 
         coefficients_data = model_data.get("coefficients", {})
@@ -222,10 +226,59 @@ async def rbf_coefficients(
             "scale_factor": extract_array(
                 model_data.get("scale_factor", [1.0, 1.0, 1.0])
             ),
-            "extents": extents.tolist(),
+            "extents": extents,
+        }
+
+        if wants_msgpack(accept):
+            return MsgPackResponse(response_data)
+        return NumpyJSONResponse(response_data)
+
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"RBF fitting failed: {str(e)}")
+
+
+@app.post(
+    "/rbf/model",
+    response_class=Response,
+    responses={
+        200: {
+            "content": {"application/json": {}},
+            "description": "Fitted model in ferreus_rbf's save_model JSON format",
         }
+    },
+)
+async def rbf_model(
+    request: RBFCoefficientsRequest,
+    _: None = Depends(verify_api_key),
+):
+    """
+    Fit RBF model from spatial intervals and return the saved model as-is.
+
+    Returns the JSON written by ferreus_rbf's ``save_model`` without parsing
+    or reshaping it, for clients that load the model with ferreus_rbf
+    (``RBFInterpolator.load_model``) or read its native format.
+
+    Requires a valid API key.
+
+    Example:
+        Input: 3D spatial intervals with commodity values
+        Output: ferreus_rbf model JSON (points, coefficients, settings)
+    """
+    try:
+        rbf_interpolator, _extents = await run_rbf_in_threadpool(
+            fit_rbf_from_intervals,
+            request.intervals,
+            request.fitting_accuracy,
+            get_settings().rbf_model_cache_dir,
+        )
 
-        return RBFCoefficientsResponse(**response_data)
+        # Pass the saved bytes straight through, no parse/re-serialize
+        raw_model = await run_rbf_in_threadpool(
+            extract_coefficients_raw, rbf_interpolator
+        )
+        return Response(content=raw_model, media_type="application/json")
 
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
@@ -244,6 +297,10 @@ async def rbf_evaluate(
     Performs server-side RBF evaluation. The client sends training data
     (spatial intervals) and query points, and receives interpolated values.
 
+    Problems of at most 256 intervals and 65536 query points are solved
+    exactly (app.rbf_direct), so ``fitting_accuracy`` has no effect there and
+    values can differ slightly from evaluating /rbf/coefficients output.
+
     Requires a valid API key.
 
     Example:
@@ -251,16 +308,67 @@ async def rbf_evaluate(
         Output: Interpolated commodity values at query points
     """
     try:
-        # Fit RBF and evaluate at query points
-        values, extents = evaluate_at_query_points(
+        # Fit RBF and evaluate at query points (CPU-bound, run off the event loop)
+        values, extents = await run_rbf_in_threadpool(
+            evaluate_at_query_points,
             request.intervals,
             request.query_points,
             request.fitting_accuracy,
+            get_settings().rbf_model_cache_dir,
+        )
+
+        return NumpyJSONResponse(
+            {
+                "values": values,
+                "extents": extents,
+            }
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"RBF evaluation failed: {str(e)}")
+
+
+@app.post("/v2/rbf/evaluate", response_model=RBFEvaluateResponse)
+async def rbf_evaluate_v2(
+    request: RBFEvaluateRequestV2,
+    _: None = Depends(verify_api_key),
+):
+    """
+    Fit RBF model from columnar training rows and evaluate at query points.
+
+    Same result as /rbf/evaluate, but training data (`intervals_xyzv`) and
+    query points (`query_xyz`) are sent as numeric rows rather than objects,
+    which avoids building a Python object per point for large requests.
+
+    As with /rbf/evaluate, problems within the direct-solver limits are solved
+    exactly and ignore ``fitting_accuracy``.
+
+    Requires a valid API key.
+
+    Example:
+        Input: N x 4 [x, y, z, value] rows + M x 3 [x, y, z] query rows
+        Output: Interpolated commodity values at query points
+    """
+    try:
+        # Split the N x 4 rows into contiguous point and value columns
+        intervals = request.intervals_xyzv
+        values, extents = await run_rbf_in_threadpool(
+            evaluate_arrays_at_query_points,
+            np.ascontiguousarray(intervals[:, :3]),
+            np.ascontiguousarray(intervals[:, 3:4]),
+            request.query_xyz,
+            request.fitting_accuracy,
+            get_settings().rbf_model_cache_dir,
         )
 
-        return RBFEvaluateResponse(
-            values=values,
-            extents=extents.tolist(),
+        return NumpyJSONResponse(
+            {
+                # One value channel: M x 1 -> M
+                "values": values[:, 0],
+                "extents": extents,
+            }
         )
 
     except ValueError as e:
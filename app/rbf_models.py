@@ -5,8 +5,141 @@ These models define the request/response schemas for geological RBF operations
 using 3D spatial coordinates (x, y, z) and commodity values.
 """
 
-from pydantic import BaseModel, ConfigDict, Field
-from typing import Optional
+import itertools
+from typing import Annotated, Any, Callable, Optional
+
+import numpy as np
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PlainSerializer,
+    PlainValidator,
+    WithJsonSchema,
+    field_validator,
+)
+
+from app.rbf_direct import MAX_DIRECT_SOURCE_POINTS, MAX_DIRECT_TARGET_POINTS
+
+
+def _float_array_validator(ndim: int) -> Callable[[Any], np.ndarray]:
+    """Build a validator that converts JSON lists straight to a float64 ndarray.
+
+    Values are written into a preallocated buffer with ``np.fromiter`` (2D
+    input is flattened row by row first), instead of pydantic coercing and
+    boxing every element of a nested ``list[list[float]]``.
+    """
+    error = f"Expected a {ndim}D array of numbers"
+
+    def validate(value: Any) -> np.ndarray:
+        if isinstance(value, np.ndarray):
+            array = value.astype(np.float64, copy=False)
+            if array.ndim != ndim:
+                raise ValueError(f"{error}, got {array.ndim}D")
+        elif isinstance(value, list):
+            try:
+                if ndim == 1:
+                    array = np.fromiter(value, dtype=np.float64, count=len(value))
+                else:
+                    array = _rows_to_array(value)
+            except (TypeError, ValueError) as e:
+                raise ValueError(error) from e
+        else:
+            raise ValueError(error)
+        # NumPy turns JSON null into NaN; reject it like pydantic's float would
+        if np.isnan(array).any():
+            raise ValueError(f"{error}, got null/NaN")
+        return array
+
+    return validate
+
+
+def _rows_to_array(rows: list) -> np.ndarray:
+    """Flatten equal-length rows into one preallocated N x D float64 array."""
+    # Rows must all be lists of the same length, or the flattened buffer
+    # would be silently reinterpreted with the wrong shape
+    ncols = len(rows[0]) if rows else 0
+    if rows and (set(map(type, rows)) != {list} or set(map(len, rows)) != {ncols}):
+        raise ValueError("Rows must be lists of equal length")
+    flat = itertools.chain.from_iterable(rows)
+    return np.fromiter(flat, dtype=np.float64, count=len(rows) * ncols).reshape(
+        len(rows), ncols
+    )
+
+
+# fitting_accuracy description for the evaluate endpoints, which solve small
+# problems exactly (app.rbf_direct) instead of fitting with ferreus_rbf
+_EVALUATE_FITTING_ACCURACY_DESCRIPTION = (
+    "Desired absolute fitting accuracy for RBF approximation. Has no effect "
+    f"for problems of at most {MAX_DIRECT_SOURCE_POINTS} intervals and "
+    f"{MAX_DIRECT_TARGET_POINTS} query points, which are solved exactly, so "
+    "values there can differ slightly from evaluating /rbf/coefficients output"
+)
+
+
+def _array_to_list(array: np.ndarray) -> list:
+    return array.tolist()
+
+
+# 1D / 2D float64 arrays validated by NumPy, documented as plain JSON arrays
+FloatArray1D = Annotated[
+    np.ndarray,
+    PlainValidator(_float_array_validator(1)),
+    PlainSerializer(_array_to_list, return_type=list[float]),
+    WithJsonSchema({"type": "array", "items": {"type": "number"}}),
+]
+FloatArray2D = Annotated[
+    np.ndarray,
+    PlainValidator(_float_array_validator(2)),
+    PlainSerializer(_array_to_list, return_type=list[list[float]]),
+    WithJsonSchema(
+        {"type": "array", "items": {"type": "array", "items": {"type": "number"}}}
+    ),
+]
+
+
+class RBFRequest(BaseModel):
+    """Request model for RBF interpolation."""
+
+    training_points: FloatArray2D = Field(
+        ...,
+        description="N x D array of training point coordinates (e.g., [[x1, y1], [x2, y2], ...])",
+    )
+    training_values: FloatArray1D = Field(
+        ...,
+        description="N values corresponding to each training point",
+    )
+    test_points: FloatArray2D = Field(
+        ...,
+        description="M x D array of test point coordinates where values should be interpolated",
+    )
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "training_points": [[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
+                "training_values": [0.0, 1.0, 1.0, 2.0],
+                "test_points": [[0.5, 0.5]],
+            }
+        }
+    )
+
+
+class RBFResponse(BaseModel):
+    """Response model for RBF interpolation."""
+
+    interpolated_values: list[float] = Field(
+        ...,
+        description="M interpolated values at the test point locations",
+    )
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "interpolated_values": [1.0],
+            }
+        }
+    )
 
 
 class SpatialInterval(BaseModel):
@@ -15,7 +148,20 @@ class SpatialInterval(BaseModel):
     x: float = Field(..., description="UTM easting in meters")
     y: float = Field(..., description="UTM northing in meters")
     z: float = Field(..., description="Elevation in meters above sea level")
-    value: float = Field(..., description="Commodity value (signed distance)")
+    value: float | list[float] = Field(
+        ...,
+        description=(
+            "Commodity value (signed distance), or a list with one value per "
+            "commodity channel (same length for every interval)"
+        ),
+    )
+
+    @field_validator("value")
+    @classmethod
+    def _check_value_channels(cls, value: float | list[float]) -> float | list[float]:
+        if isinstance(value, list) and not value:
+            raise ValueError("value list must have at least one channel")
+        return value
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -87,7 +233,7 @@ class RBFCoefficientsResponse(BaseModel):
         ..., description="N x 3 array of source point coordinates (after transformation)"
     )
     point_coefficients: list[list[float]] = Field(
-        ..., description="N x 1 array of RBF coefficients for each source point"
+        ..., description="N x K array of RBF coefficients for each source point (K value channels)"
     )
     poly_coefficients: Optional[list[list[float]]] = Field(
         None, description="Polynomial coefficients (if polynomial augmentation is used)"
@@ -104,6 +250,8 @@ class RBFCoefficientsResponse(BaseModel):
     extents: list[float] = Field(
         ...,
         description="Axis-aligned bounding box of source points [min_x, min_y, min_z, max_x, max_y, max_z]",
+        min_length=6,
+        max_length=6,
     )
 
     model_config = ConfigDict(
@@ -138,7 +286,7 @@ class RBFEvaluateRequest(BaseModel):
     )
     fitting_accuracy: Optional[float] = Field(
         default=0.01,
-        description="Desired absolute fitting accuracy for RBF approximation",
+        description=_EVALUATE_FITTING_ACCURACY_DESCRIPTION,
         gt=0.0,
     )
 
@@ -161,15 +309,76 @@ class RBFEvaluateRequest(BaseModel):
     )
 
 
+class RBFEvaluateRequestV2(BaseModel):
+    """Columnar (structure-of-arrays) variant of RBFEvaluateRequest.
+
+    Training data and query points are sent as plain numeric rows instead of
+    one object per point, so they convert to contiguous arrays in a single
+    NumPy call with no per-point Python objects.
+    """
+
+    intervals_xyzv: FloatArray2D = Field(
+        ...,
+        description="N x 4 array of training rows [x, y, z, value]",
+    )
+    query_xyz: FloatArray2D = Field(
+        ...,
+        description="M x 3 array of query point rows [x, y, z]",
+    )
+    fitting_accuracy: Optional[float] = Field(
+        default=0.01,
+        description=_EVALUATE_FITTING_ACCURACY_DESCRIPTION,
+        gt=0.0,
+    )
+
+    @field_validator("intervals_xyzv")
+    @classmethod
+    def _check_intervals_shape(cls, value: np.ndarray) -> np.ndarray:
+        if value.shape[0] < 1 or value.shape[1] != 4:
+            raise ValueError("intervals_xyzv must be a non-empty N x 4 array")
+        return value
+
+    @field_validator("query_xyz")
+    @classmethod
+    def _check_query_shape(cls, value: np.ndarray) -> np.ndarray:
+        if value.shape[0] < 1 or value.shape[1] != 3:
+            raise ValueError("query_xyz must be a non-empty M x 3 array")
+        return value
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "intervals_xyzv": [
+                    [500000.0, 4500000.0, 100.0, 0.0],
+                    [501000.0, 4500000.0, 100.0, 1.0],
+                    [500000.0, 4501000.0, 100.0, 1.0],
+                    [501000.0, 4501000.0, 100.0, 2.0],
+                ],
+                "query_xyz": [
+                    [500500.0, 4500500.0, 100.0],
+                    [500250.0, 4500250.0, 100.0],
+                ],
+                "fitting_accuracy": 0.01,
+            }
+        }
+    )
+
+
 class RBFEvaluateResponse(BaseModel):
     """RBF evaluation results at query points."""
 
-    values: list[float] = Field(
-        ..., description="Interpolated commodity values at each query point"
+    values: list[float] | list[list[float]] = Field(
+        ...,
+        description=(
+            "Interpolated commodity values at each query point (one list of "
+            "channel values per point when intervals carry value lists)"
+        ),
     )
     extents: list[float] = Field(
         ...,
         description="Axis-aligned bounding box of training points [min_x, min_y, min_z, max_x, max_y, max_z]",
+        min_length=6,
+        max_length=6,
     )
 
     model_config = ConfigDict(
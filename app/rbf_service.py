@@ -2,17 +2,29 @@
 Service layer for RBF interpolation operations.
 
 Handles the business logic for fitting RBF models, extracting coefficients,
-and evaluating at query points. Implements proper file management with
-context managers for temporary files.
+and evaluating at query points. Models are serialized through an in-memory
+file where the platform allows it, with a cleaned-up temporary file
+otherwise. Fitted models are kept in a small in-process LRU cache, each
+with a prebuilt FMM evaluator, so repeated requests on the same training
+data skip both the fit and the tree build; an optional shared directory
+extends the fit cache across worker processes.
 """
 
-import json
+import contextlib
+import hashlib
 import logging
 import os
 import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import chain
+from operator import attrgetter
 from typing import Any
 
 import numpy as np
+import orjson
 from ferreus_rbf import RBFInterpolator
 from ferreus_rbf.interpolant_config import (
     FittingAccuracy,
@@ -21,14 +33,106 @@ from ferreus_rbf.interpolant_config import (
     RBFKernelType,
 )
 
+from app.rbf_direct import fit_and_evaluate_linear_rbf, use_direct_solver
 from app.rbf_models import QueryPoint, SpatialInterval
 
 logger = logging.getLogger(__name__)
 
+# Fitted models keyed by a digest of the training data and fitting settings
+_MODEL_CACHE_MAXSIZE = 64
+_model_cache: OrderedDict[bytes, tuple[RBFInterpolator, np.ndarray]] = OrderedDict()
+_model_cache_lock = threading.Lock()
+
+# Query points per evaluate_targets() call; the FMM evaluator's working memory
+# grows with the number of targets per call, not with targets x sources
+_EVALUATE_CHUNK_POINTS = 65536
+
+# Temp files in the shared model directory older than this were left by a
+# worker that died mid-save (a live save finishes well within it)
+_STALE_TEMP_SECONDS = 600
+
+_interval_fields = attrgetter("x", "y", "z", "value")
+_point_fields = attrgetter("x", "y", "z")
+_value_field = attrgetter("value")
+
+
+def _fields_to_array(items: list[Any], getter: attrgetter, ncols: int) -> np.ndarray:
+    """Pack each item's getter() tuple into an N x ncols float64 array in one pass."""
+    return np.fromiter(
+        chain.from_iterable(map(getter, items)),
+        dtype=np.float64,
+        count=len(items) * ncols,
+    ).reshape(len(items), ncols)
+
+
+def _intervals_to_arrays(
+    intervals: list[SpatialInterval],
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Split intervals into contiguous N x 3 points and N x K values.
+
+    Scalar values give K = 1; list values (one per commodity channel) give
+    K = len(value), which must be the same for every interval.
+
+    Raises:
+        ValueError: If intervals mix scalar and list values or differ in length
+    """
+    n = len(intervals)
+    rows = list(map(_value_field, intervals))
+    value_types = set(map(type, rows))
+    if list in value_types and value_types != {list}:
+        raise ValueError("Interval values must all be numbers or all be lists")
+
+    if value_types != {list}:
+        # Scalar values: pack everything through one N x 4 buffer
+        intervals_xyzv = _fields_to_array(intervals, _interval_fields, 4)
+        return (
+            np.ascontiguousarray(intervals_xyzv[:, :3]),
+            np.ascontiguousarray(intervals_xyzv[:, 3:4]),
+        )
+
+    n_channels = len(rows[0])
+    if set(map(len, rows)) != {n_channels}:
+        raise ValueError("Interval value lists must all have the same length")
+    source_values = np.fromiter(
+        chain.from_iterable(rows), dtype=np.float64, count=n * n_channels
+    ).reshape(n, n_channels)
+    return _fields_to_array(intervals, _point_fields, 3), source_values
+
+
+def _model_cache_key(
+    source_points: np.ndarray,
+    source_values: np.ndarray,
+    fitting_accuracy: float,
+) -> bytes:
+    """Digest of the training arrays (shape + raw float64 bytes) and accuracy."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(
+        repr((source_points.shape, source_values.shape, fitting_accuracy)).encode()
+    )
+    digest.update(np.ascontiguousarray(source_points, dtype=np.float64))
+    digest.update(np.ascontiguousarray(source_values, dtype=np.float64))
+    return digest.digest()
+
+
+def clear_model_cache() -> None:
+    """Drop all cached fitted models."""
+    with _model_cache_lock:
+        _model_cache.clear()
+
+
+@lru_cache(maxsize=32)
+def _interpolant_settings(fitting_accuracy: float) -> InterpolantSettings:
+    """Linear-kernel settings with an absolute fitting accuracy, built once per value."""
+    # Use Linear kernel (as specified in example code)
+    accuracy = FittingAccuracy(fitting_accuracy, FittingAccuracyType.Absolute)
+    return InterpolantSettings(RBFKernelType.Linear, fitting_accuracy=accuracy)
+
 
 def fit_rbf_from_intervals(
     intervals: list[SpatialInterval],
     fitting_accuracy: float = 0.01,
+    shared_dir: str | None = None,
 ) -> tuple[RBFInterpolator, np.ndarray]:
     """
     Fit an RBF model from spatial intervals.
@@ -36,59 +140,183 @@ def fit_rbf_from_intervals(
     Args:
         intervals: List of 3D spatial points with commodity values
         fitting_accuracy: Desired absolute fitting accuracy
+        shared_dir: Directory for sharing fitted models across workers
+            (see fit_rbf_from_arrays), or None
 
     Returns:
         Tuple of (fitted RBFInterpolator, extents array)
         extents: [min_x, min_y, min_z, max_x, max_y, max_z]
 
     Raises:
-        ValueError: If intervals list is empty
+        ValueError: If intervals list is empty or value channels are inconsistent
     """
     if not intervals:
         raise ValueError("At least one interval is required")
 
-    # Extract source points and values from intervals
-    source_points = np.array(
-        [[interval.x, interval.y, interval.z] for interval in intervals],
-        dtype=np.float64,
-    )
-    source_values = np.array(
-        [[interval.value] for interval in intervals],
-        dtype=np.float64,
+    source_points, source_values = _intervals_to_arrays(intervals)
+    return fit_rbf_from_arrays(
+        source_points, source_values, fitting_accuracy, shared_dir
     )
 
+
+def fit_rbf_from_arrays(
+    source_points: np.ndarray,
+    source_values: np.ndarray,
+    fitting_accuracy: float = 0.01,
+    shared_dir: str | None = None,
+) -> tuple[RBFInterpolator, np.ndarray]:
+    """
+    Fit an RBF model from contiguous source arrays.
+
+    Results are cached per (points, values, fitting_accuracy), so fitting the
+    same training data again returns the already-fitted model. Each fitted
+    model gets a stored FMM evaluator over its extents for fast repeated
+    evaluation. If shared_dir is given (the app passes RBF_MODEL_CACHE_DIR),
+    fitted models are also saved there so other worker processes can load
+    them instead of refitting.
+
+    Args:
+        source_points: N x 3 float64 array of point coordinates
+        source_values: N x K float64 array of commodity values (K channels,
+            fitted together against one set of points)
+        fitting_accuracy: Desired absolute fitting accuracy
+        shared_dir: Directory for sharing fitted models across workers, or
+            None to keep them in this process only
+
+    Returns:
+        Tuple of (fitted RBFInterpolator, extents array)
+        extents: [min_x, min_y, min_z, max_x, max_y, max_z]
+
+    Raises:
+        ValueError: If no source points are given
+    """
+    if source_points.shape[0] == 0:
+        raise ValueError("At least one interval is required")
+
+    # Reuse a previously fitted model for identical training data
+    cache_key = _model_cache_key(source_points, source_values, fitting_accuracy)
+    with _model_cache_lock:
+        cached = _model_cache.get(cache_key)
+        if cached is not None:
+            _model_cache.move_to_end(cache_key)
+    if cached is not None:
+        logger.debug("Reusing cached RBF model")
+        return cached
+
     # Calculate axis-aligned bounding box extents
-    extents = np.concatenate(
-        (
-            np.floor(np.min(source_points, axis=0)),
-            np.ceil(np.max(source_points, axis=0)),
+    extents = _compute_extents(source_points)
+
+    # Another worker may already have fitted this model
+    rbf_interpolator = None
+    if shared_dir:
+        rbf_interpolator = _load_shared_model(shared_dir, cache_key)
+
+    if rbf_interpolator is None:
+        # Linear-kernel settings for this accuracy (shared, read-only)
+        settings = _interpolant_settings(fitting_accuracy)
+
+        # Fit the RBF model
+        logger.info(
+            "Fitting RBF with %d intervals, fitting_accuracy=%s",
+            source_points.shape[0],
+            fitting_accuracy,
         )
-    )
+        rbf_interpolator = RBFInterpolator(source_points, source_values, settings)
+        if shared_dir:
+            _store_shared_model(shared_dir, cache_key, rbf_interpolator)
 
-    # Use Linear kernel (as specified in example code)
-    kernel_type = RBFKernelType.Linear
+    # Build the stored evaluator before the model is shared through the cache,
+    # so concurrent requests only ever read it
+    rbf_interpolator.build_evaluator(extents)
 
-    # Configure fitting accuracy
-    accuracy = FittingAccuracy(fitting_accuracy, FittingAccuracyType.Absolute)
+    with _model_cache_lock:
+        _model_cache[cache_key] = (rbf_interpolator, extents)
+        _model_cache.move_to_end(cache_key)
+        while len(_model_cache) > _MODEL_CACHE_MAXSIZE:
+            _model_cache.popitem(last=False)
 
-    # Initialize interpolant settings
-    settings = InterpolantSettings(kernel_type, fitting_accuracy=accuracy)
+    return rbf_interpolator, extents
 
-    # Fit the RBF model
-    logger.info(
-        f"Fitting RBF with {len(intervals)} intervals, "
-        f"fitting_accuracy={fitting_accuracy}"
-    )
-    rbf_interpolator = RBFInterpolator(source_points, source_values, settings)
 
-    return rbf_interpolator, extents
+def _compute_extents(source_points: np.ndarray) -> np.ndarray:
+    """[min_x, min_y, min_z, max_x, max_y, max_z] rounded outward to integers."""
+    # Reduce and round straight into one 6-element buffer, no temporaries
+    ndim = source_points.shape[1]
+    extents = np.empty(2 * ndim, dtype=np.float64)
+    lower, upper = extents[:ndim], extents[ndim:]
+    np.min(source_points, axis=0, out=lower)
+    np.max(source_points, axis=0, out=upper)
+    np.floor(lower, out=lower)
+    np.ceil(upper, out=upper)
+    return extents
+
+
+def _shared_model_path(shared_dir: str, cache_key: bytes) -> str:
+    return os.path.join(shared_dir, f"{cache_key.hex()}.json")
+
+
+def _load_shared_model(shared_dir: str, cache_key: bytes) -> RBFInterpolator | None:
+    """Load a model another worker saved for this cache key, if there is one."""
+    path = _shared_model_path(shared_dir, cache_key)
+    if not os.path.exists(path):
+        return None
+    try:
+        rbf_interpolator = RBFInterpolator.load_model(path)
+    except Exception as e:
+        # A bad shared file only costs a refit
+        logger.warning("Failed to load shared RBF model %s: %s", path, e)
+        return None
+    logger.debug("Loaded shared RBF model %s", path)
+    return rbf_interpolator
+
+
+def _store_shared_model(
+    shared_dir: str,
+    cache_key: bytes,
+    rbf_interpolator: RBFInterpolator,
+) -> None:
+    """Save a fitted model for other workers, then prune the oldest files."""
+    path = _shared_model_path(shared_dir, cache_key)
+    try:
+        os.makedirs(shared_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=shared_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            rbf_interpolator.save_model(temp_path)
+            # Atomic rename: readers only ever see a complete model file
+            os.replace(temp_path, path)
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(temp_path)
+        _prune_shared_models(shared_dir)
+    except Exception as e:
+        # Sharing is best-effort; this worker keeps its own cached copy
+        logger.warning("Failed to store shared RBF model %s: %s", path, e)
+
+
+def _prune_shared_models(shared_dir: str) -> None:
+    """Keep only the newest _MODEL_CACHE_MAXSIZE shared models; drop stale temps."""
+    entries = []
+    stale_before = time.time() - _STALE_TEMP_SECONDS
+    for entry in os.scandir(shared_dir):
+        if not entry.is_file():
+            continue
+        if entry.name.endswith(".json"):
+            entries.append(entry)
+        elif entry.name.endswith(".tmp") and entry.stat().st_mtime < stale_before:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(entry.path)
+    if len(entries) <= _MODEL_CACHE_MAXSIZE:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[: len(entries) - _MODEL_CACHE_MAXSIZE]:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(entry.path)
 
 
 def extract_coefficients(rbf_interpolator: RBFInterpolator) -> dict[str, Any]:
     """
-    Extract RBF model coefficients by saving to temporary file and parsing JSON.
-
-    Uses proper file management with try/finally to ensure cleanup.
+    Extract RBF model coefficients by saving the model and parsing its JSON.
 
     Args:
         rbf_interpolator: Fitted RBF interpolator instance
@@ -99,6 +327,63 @@ def extract_coefficients(rbf_interpolator: RBFInterpolator) -> dict[str, Any]:
     Raises:
         RuntimeError: If model save/load fails
     """
+    model_data = orjson.loads(_save_model_bytes(rbf_interpolator))
+    logger.debug("Successfully extracted coefficients from RBF model")
+    return model_data
+
+
+def extract_coefficients_raw(rbf_interpolator: RBFInterpolator) -> bytes:
+    """
+    Return the fitted model exactly as ferreus_rbf serializes it (JSON bytes).
+
+    Use this when the model JSON is passed on unchanged, to skip parsing it.
+
+    Args:
+        rbf_interpolator: Fitted RBF interpolator instance
+
+    Returns:
+        UTF-8 JSON bytes in ferreus_rbf's save_model format
+    """
+    return _save_model_bytes(rbf_interpolator)
+
+
+@lru_cache(maxsize=1)
+def _memfd_supported() -> bool:
+    """Whether models can be saved to an anonymous in-memory file (Linux)."""
+    return hasattr(os, "memfd_create") and os.path.isdir("/proc/self/fd")
+
+
+def _save_model_bytes(rbf_interpolator: RBFInterpolator) -> bytes:
+    """
+    Serialize a fitted model to its JSON bytes.
+
+    ferreus_rbf only saves to a filesystem path, so on Linux the model is
+    written to a memfd through its /proc/self/fd path and never touches disk.
+    Other platforms (or a failing memfd) use a temporary file.
+    """
+    if _memfd_supported():
+        try:
+            return _save_model_bytes_memfd(rbf_interpolator)
+        except OSError as e:
+            logger.warning("In-memory model save failed, using temporary file: %s", e)
+    return _save_model_bytes_tempfile(rbf_interpolator)
+
+
+def _save_model_bytes_memfd(rbf_interpolator: RBFInterpolator) -> bytes:
+    """Save the model into an anonymous memfd and read it back."""
+    fd = os.memfd_create("rbf-model", os.MFD_CLOEXEC)
+    # fdopen takes ownership of fd and closes it, releasing the memory
+    with os.fdopen(fd, "rb") as f:
+        rbf_interpolator.save_model(f"/proc/self/fd/{fd}")
+        return f.read()
+
+
+def _save_model_bytes_tempfile(rbf_interpolator: RBFInterpolator) -> bytes:
+    """
+    Save the model to a temporary file and read it back.
+
+    Uses proper file management with try/finally to ensure cleanup.
+    """
     # Create temporary file (delete=False so we can read it after closing)
     temp_file = tempfile.NamedTemporaryFile(
         mode="w",
@@ -112,31 +397,29 @@ def extract_coefficients(rbf_interpolator: RBFInterpolator) -> dict[str, Any]:
         temp_file.close()
 
         # Save the RBF model to JSON
-        logger.debug(f"Saving RBF model to temporary file: {temp_path}")
+        logger.debug("Saving RBF model to temporary file: %s", temp_path)
         rbf_interpolator.save_model(temp_path)
 
-        # Read and parse the JSON file
-        with open(temp_path, "r") as f:
-            model_data = json.load(f)
-
-        logger.debug("Successfully extracted coefficients from RBF model")
-        return model_data
+        with open(temp_path, "rb") as f:
+            return f.read()
 
     finally:
-        # Guaranteed cleanup - remove temp file even if errors occur
-        if os.path.exists(temp_path):
-            try:
+        # Guaranteed cleanup - remove temp file even if errors occur; a file
+        # that is already gone is fine, anything else is only logged
+        try:
+            with contextlib.suppress(FileNotFoundError):
                 os.unlink(temp_path)
-                logger.debug(f"Cleaned up temporary file: {temp_path}")
-            except OSError as e:
-                logger.warning(f"Failed to clean up temporary file {temp_path}: {e}")
+                logger.debug("Cleaned up temporary file: %s", temp_path)
+        except OSError as e:
+            logger.warning("Failed to clean up temporary file %s: %s", temp_path, e)
 
 
 def evaluate_at_query_points(
     intervals: list[SpatialInterval],
     query_points: list[QueryPoint],
     fitting_accuracy: float = 0.01,
-) -> tuple[list[float], np.ndarray]:
+    shared_dir: str | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
     """
     Fit RBF model from intervals and evaluate at query points.
 
@@ -144,35 +427,112 @@ def evaluate_at_query_points(
         intervals: Training data (3D spatial points with commodity values)
         query_points: Points where RBF should be evaluated
         fitting_accuracy: Desired absolute fitting accuracy
+        shared_dir: Directory for sharing fitted models across workers, or None
 
     Returns:
-        Tuple of (evaluated values list, extents array)
+        Tuple of (evaluated values array, extents array). Values are M long
+        for scalar interval values, or M x K for K-channel list values.
 
     Raises:
-        ValueError: If intervals or query_points are empty
+        ValueError: If intervals or query_points are empty, or value channels
+            are inconsistent
     """
     if not intervals:
         raise ValueError("At least one interval is required")
     if not query_points:
         raise ValueError("At least one query point is required")
 
-    # Fit the RBF model
-    rbf_interpolator, extents = fit_rbf_from_intervals(intervals, fitting_accuracy)
+    source_points, source_values = _intervals_to_arrays(intervals)
 
     # Convert query points to numpy array
-    query_array = np.array(
-        [[point.x, point.y, point.z] for point in query_points],
-        dtype=np.float64,
+    query_array = _fields_to_array(query_points, _point_fields, 3)
+
+    values, extents = evaluate_arrays_at_query_points(
+        source_points, source_values, query_array, fitting_accuracy, shared_dir
     )
+    if not isinstance(intervals[0].value, list):
+        # Scalar inputs get one value per query point
+        values = values[:, 0]
+    return values, extents
 
-    # Evaluate RBF at query points
-    logger.info(f"Evaluating RBF at {len(query_points)} query points")
-    interpolated = rbf_interpolator.evaluate(query_array)
 
-    # Extract values from 2D array (N x 1) to 1D list
-    if interpolated.ndim == 2:
-        values = interpolated[:, 0].tolist()
-    else:
-        values = interpolated.tolist()
+def evaluate_arrays_at_query_points(
+    source_points: np.ndarray,
+    source_values: np.ndarray,
+    query_array: np.ndarray,
+    fitting_accuracy: float = 0.01,
+    shared_dir: str | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fit RBF model from contiguous source arrays and evaluate at query points.
 
-    return values, extents
+    Small problems (see app.rbf_direct.use_direct_solver) are solved exactly
+    with NumPy instead of ferreus_rbf, so fitting_accuracy does not apply to
+    them; singular systems fall back to ferreus_rbf.
+
+    Args:
+        source_points: N x 3 float64 array of training point coordinates
+        source_values: N x K float64 array of commodity values
+        query_array: M x 3 float64 array of points to evaluate
+        fitting_accuracy: Desired absolute fitting accuracy
+        shared_dir: Directory for sharing fitted models across workers, or None
+
+    Returns:
+        Tuple of (M x K evaluated values array, extents array)
+
+    Raises:
+        ValueError: If there are no source points or no query points
+    """
+    if source_points.shape[0] == 0:
+        raise ValueError("At least one interval is required")
+    if query_array.shape[0] == 0:
+        raise ValueError("At least one query point is required")
+
+    if use_direct_solver(source_points.shape[0], query_array.shape[0]):
+        try:
+            interpolated = fit_and_evaluate_linear_rbf(
+                source_points, source_values, query_array
+            )
+        except np.linalg.LinAlgError:
+            # e.g. duplicate points, which ferreus_rbf removes itself
+            logger.debug("Direct RBF solve is singular, falling back to ferreus_rbf")
+        else:
+            return interpolated, _compute_extents(source_points)
+
+    rbf_interpolator, extents = fit_rbf_from_arrays(
+        source_points, source_values, fitting_accuracy, shared_dir
+    )
+
+    interpolated = _evaluate(
+        rbf_interpolator, query_array, extents, source_values.shape[1]
+    )
+    return interpolated, extents
+
+
+def _evaluate(
+    rbf_interpolator: RBFInterpolator,
+    query_array: np.ndarray,
+    extents: np.ndarray,
+    n_channels: int,
+) -> np.ndarray:
+    """Evaluate a fitted K-channel RBF at an M x 3 query array (M x K result)."""
+    # Evaluate RBF at query points
+    logger.info("Evaluating RBF at %d query points", query_array.shape[0])
+    n_points, ndim = query_array.shape
+    if np.all(query_array.min(axis=0) >= extents[:ndim]) and np.all(
+        query_array.max(axis=0) <= extents[ndim:]
+    ):
+        # Reuse the evaluator built at fit time, a bounded chunk of targets at
+        # a time, filling one preallocated output
+        values = np.empty((n_points, n_channels), dtype=np.float64)
+        for start in range(0, n_points, _EVALUATE_CHUNK_POINTS):
+            stop = min(start + _EVALUATE_CHUNK_POINTS, n_points)
+            values[start:stop] = rbf_interpolator.evaluate_targets(
+                query_array[start:stop]
+            )
+        return values
+
+    # Stored evaluator only covers the training extents (evaluate_targets
+    # panics outside them); one-shot evaluate() builds a tree that fits. Not
+    # chunked, since each call would rebuild the tree.
+    return rbf_interpolator.evaluate(query_array)
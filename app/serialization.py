@@ -0,0 +1,120 @@
+"""
+orjson-backed request parsing and response rendering.
+
+RBF requests and responses are dominated by large lists of floats, where the
+stdlib ``json`` module is the main cost. These helpers move both directions
+onto orjson, which also serializes NumPy arrays straight from their buffers.
+Clients that ask for it can get MessagePack instead, which carries floats as
+raw 8-byte values rather than decimal text.
+"""
+
+from typing import Any, Callable, Coroutine
+
+import numpy as np
+import orjson
+import ormsgpack
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+# Accept media ranges that JSON (the default response) satisfies
+_JSON_MEDIA_RANGES = frozenset({"application/json", "application/*", "*/*"})
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for values orjson cannot serialize natively (e.g. strided arrays)."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONRequest(Request):
+    """Request whose JSON body is parsed with orjson instead of the stdlib."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so FastAPI
+            # still turns malformed bodies into a 422.
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    """APIRoute that hands endpoints an ORJSONRequest."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        original_route_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            request = ORJSONRequest(request.scope, request.receive)
+            return await original_route_handler(request)
+
+        return route_handler
+
+
+class NumpyJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, accepting NumPy arrays as values.
+
+    Returning this directly from an endpoint skips FastAPI's response-model
+    validation and ``.tolist()`` copies; the endpoint's ``response_model`` is
+    still used for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
+class MsgPackResponse(Response):
+    """MessagePack response rendered by ormsgpack, accepting NumPy arrays as values."""
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return ormsgpack.packb(
+            content,
+            default=_default,
+            option=ormsgpack.OPT_SERIALIZE_NUMPY,
+        )
+
+
+def wants_msgpack(accept: str | None) -> bool:
+    """Whether an Accept header prefers MessagePack over JSON.
+
+    MessagePack is chosen only when its q is strictly higher than the best q
+    among ``application/json``, ``application/*`` and ``*/*``, so ties and
+    wildcards keep the JSON default. A q that is unparseable or outside
+    [0, 1] counts as 0 (not acceptable).
+    """
+    if not accept:
+        return False
+    msgpack_quality = 0.0
+    json_quality = 0.0
+    for media_range in accept.split(","):
+        media_type, *params = media_range.split(";")
+        media_type = media_type.strip().lower()
+        quality = _media_range_quality(params)
+        if media_type == MSGPACK_MEDIA_TYPE:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif media_type in _JSON_MEDIA_RANGES:
+            json_quality = max(json_quality, quality)
+    return msgpack_quality > json_quality
+
+
+def _media_range_quality(params: list[str]) -> float:
+    """q of one Accept media range (1 if absent, 0 if invalid)."""
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                return 0.0
+            # nan and inf fail this range check too
+            return quality if 0.0 <= quality <= 1.0 else 0.0
+    return 1.0
@@ -4,7 +4,9 @@ Pytest configuration and shared fixtures for geology-engine tests.
 GEOLOGY_ENGINE_API_KEY is set before any app import so auth uses a known test key.
 """
 import os
+from types import MappingProxyType
 
+import httpx
 import pytest
 
 # Set test API key before app is imported
@@ -13,17 +15,70 @@ os.environ.setdefault("GEOLOGY_ENGINE_API_KEY", "test-api-key-do-not-use-in-prod
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.rbf_service import clear_model_cache
 
 TEST_API_KEY = os.environ["GEOLOGY_ENGINE_API_KEY"]
 
 
+@pytest.fixture(scope="session")
+def _app_client():
+    """FastAPI test client, started once for the whole session."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
 @pytest.fixture
-def client():
-    """FastAPI test client."""
-    return TestClient(app)
+def client(_app_client):
+    """Shared test client; resets mutable app state after each test.
+
+    Tests that patch module attributes (e.g. ``app.auth.get_settings``) use
+    ``monkeypatch``, which is undone per test. Dependency overrides and the
+    fitted-model cache live on the app itself, so they are cleared here.
+    """
+    yield _app_client
+    app.dependency_overrides.clear()
+    clear_model_cache()
 
 
 @pytest.fixture
+def fresh_model_cache():
+    """Empty fitted-model cache for tests that call the RBF service directly.
+
+    Cleared before the test, so it starts from nothing, and after, so the
+    models it fitted don't leak into later tests.
+    """
+    clear_model_cache()
+    yield
+    clear_model_cache()
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    """Run ``@pytest.mark.anyio`` tests on asyncio only (what uvicorn uses)."""
+    return "asyncio"
+
+
+@pytest.fixture
+async def async_client():
+    """httpx client calling the app in-process on the test's event loop.
+
+    Use with ``@pytest.mark.anyio`` tests to issue requests concurrently.
+    Resets the same app state as ``client`` afterwards.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://testserver"
+    ) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+    clear_model_cache()
+
+
+@pytest.fixture(scope="session")
 def auth_headers():
-    """Authorization headers with the valid test API key."""
-    return {"Authorization": f"Bearer {TEST_API_KEY}"}
+    """Authorization headers with the valid test API key.
+
+    Built once per session and read-only, since every test shares it; copy
+    it (``{**auth_headers, ...}``) to add headers.
+    """
+    return MappingProxyType({"Authorization": f"Bearer {TEST_API_KEY}"})
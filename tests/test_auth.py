@@ -35,6 +35,13 @@ class TestAuthenticatedHealthCheck:
         )
         assert response.status_code == 401
 
+    def test_health_auth_returns_401_with_non_ascii_key(self, client):
+        response = client.get(
+            "/health/auth",
+            headers={"Authorization": "Bearer wrong-key-\u00e9".encode("latin-1")},
+        )
+        assert response.status_code == 401
+
     def test_health_auth_returns_200_with_valid_key(self, client, auth_headers):
         response = client.get("/health/auth", headers=auth_headers)
         assert response.status_code == 200
@@ -71,7 +78,11 @@ class TestServerConfig:
 
     def test_returns_500_when_api_key_unset(self, client, monkeypatch):
         """When GEOLOGY_ENGINE_API_KEY is empty, auth must fail closed."""
-        mock_settings = type("MockSettings", (), {"get_api_key_str": lambda self: ""})()
+        mock_settings = type(
+            "MockSettings",
+            (),
+            {"get_api_key_str": lambda self: "", "get_api_key_bytes": lambda self: b""},
+        )()
         monkeypatch.setattr("app.auth.get_settings", lambda: mock_settings)
         response = client.get(
             "/health/auth",
@@ -0,0 +1,37 @@
+"""
+Concurrency test suite: the threadpool used for CPU-bound RBF work.
+"""
+
+import anyio
+import pytest
+
+from app import concurrency
+
+
+class TestWebConcurrency:
+    """Worker count read from WEB_CONCURRENCY to size the limiter."""
+
+    @pytest.mark.parametrize(
+        ("raw", "expected"),
+        [("", 1), ("  ", 1), ("abc", 1), ("0", 1), ("4", 4)],
+    )
+    def test_web_concurrency_parsed_defensively(self, monkeypatch, raw, expected):
+        """Empty or invalid WEB_CONCURRENCY falls back to one worker."""
+        monkeypatch.setenv("WEB_CONCURRENCY", raw)
+        assert concurrency._web_concurrency() == expected
+
+
+class TestRBFThreadpool:
+    """run_rbf_in_threadpool and its per-event-loop limiter."""
+
+    def test_limiter_created_per_event_loop(self):
+        """Each event loop gets its own limiter, created on first use."""
+
+        async def limiter_in_loop():
+            assert await concurrency.run_rbf_in_threadpool(sum, [1, 2]) == 3
+            return concurrency._get_rbf_limiter()
+
+        first = anyio.run(limiter_in_loop)
+        second = anyio.run(limiter_in_loop)
+        assert first is not second
+        assert first.total_tokens == concurrency._RBF_THREAD_LIMIT
@@ -0,0 +1,21 @@
+"""
+Config test suite: how application settings are loaded.
+"""
+
+from app import config
+
+
+class TestSettingsLoading:
+    """get_settings() sources and the LOAD_DOTENV switch."""
+
+    def test_load_dotenv_disabled_skips_dotenv(self, monkeypatch):
+        """LOAD_DOTENV=0 builds settings from the environment without python-dotenv."""
+        calls = []
+        monkeypatch.setenv("LOAD_DOTENV", "0")
+        monkeypatch.setattr(config, "load_dotenv", lambda: calls.append(True))
+        config.get_settings.cache_clear()
+        try:
+            assert config.get_settings().get_api_key_str()
+            assert calls == []
+        finally:
+            config.get_settings.cache_clear()
@@ -4,72 +4,156 @@ RBF interpolation endpoint tests.
 Tests basic RBF interpolation functionality using the ferreus_rbf package.
 """
 
+import os
+import time
+
+import anyio
+import numpy as np
+import ormsgpack
 import pytest
 
+from app.rbf_direct import (
+    evaluate_linear_rbf,
+    fit_and_evaluate_linear_rbf,
+    fit_linear_rbf,
+)
+from app.rbf_models import (
+    RBFCoefficientsRequest,
+    RBFEvaluateRequest,
+    RBFEvaluateRequestV2,
+    RBFRequest,
+)
+from app.rbf_service import (
+    clear_model_cache,
+    evaluate_arrays_at_query_points,
+    extract_coefficients,
+    fit_rbf_from_arrays,
+)
+
+# Plane value = x + y sampled at the unit square's corners, shared by the
+# interpolation tests for both /rbf/interpolate and /rbf/evaluate
+PLANE_TRAINING_POINTS = [[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [1.0, 1.0]]
+PLANE_TRAINING_VALUES = [0.0, 1.0, 1.0, 2.0]
+PLANE_INTERVALS = [
+    {"x": x, "y": y, "z": 0.0, "value": value}
+    for (x, y), value in zip(PLANE_TRAINING_POINTS, PLANE_TRAINING_VALUES)
+]
+
+PLANE_CASES = [
+    # (query points in the plane, the same points as /rbf/evaluate query
+    # objects, expected values, tolerance)
+    (query, [{"x": x, "y": y, "z": 0.0} for x, y in query], expected, tolerance)
+    for query, expected, tolerance in [
+        ([[0.5, 0.5]], [1.0], 0.1),
+        # Any value in [0, 2] is reasonable for the plane
+        ([[0.5, 0.5], [0.25, 0.25], [0.75, 0.75]], [1.0, 1.0, 1.0], 1.0),
+        # Exact reproduction at the training locations
+        (PLANE_TRAINING_POINTS, PLANE_TRAINING_VALUES, 1e-6),
+    ]
+]
+PLANE_CASE_IDS = ["midpoint", "multiple", "exact-at-training"]
+
+# Payloads posted by several tests are validated against the app's request
+# models and serialized once, then sent as raw bytes
+JSON_HEADERS = {"content-type": "application/json"}
+PLANE_INTERPOLATE_BODY = RBFRequest(
+    training_points=PLANE_TRAINING_POINTS,
+    training_values=PLANE_TRAINING_VALUES,
+    test_points=[[0.5, 0.5]],
+).model_dump_json().encode()
+PLANE_COEFFICIENTS_BODY = RBFCoefficientsRequest(
+    intervals=PLANE_INTERVALS, fitting_accuracy=0.01
+).model_dump_json().encode()
+PLANE_EVALUATE_BODY = RBFEvaluateRequest(
+    intervals=PLANE_INTERVALS, query_points=[{"x": 0.5, "y": 0.5, "z": 0.0}]
+).model_dump_json().encode()
+PLANE_EVALUATE_V2_BODY = RBFEvaluateRequestV2(
+    intervals_xyzv=[[i["x"], i["y"], i["z"], i["value"]] for i in PLANE_INTERVALS],
+    query_xyz=[[0.5, 0.5, 0.0]],
+).model_dump_json().encode()
+
+
+class TestPlaneInterpolation:
+    """Interpolating the x + y plane through the public and authenticated endpoints."""
+
+    @pytest.mark.parametrize(
+        "endpoint",
+        [
+            pytest.param("/rbf/interpolate", id="interpolate"),
+            pytest.param("/rbf/evaluate", id="evaluate"),
+        ],
+    )
+    @pytest.mark.parametrize(
+        ("query", "query_points", "expected", "tolerance"),
+        PLANE_CASES,
+        ids=PLANE_CASE_IDS,
+    )
+    def test_plane_interpolation(
+        self, client, auth_headers, endpoint, query, query_points, expected, tolerance
+    ):
+        if endpoint == "/rbf/interpolate":
+            request_data = {
+                "training_points": PLANE_TRAINING_POINTS,
+                "training_values": PLANE_TRAINING_VALUES,
+                "test_points": query,
+            }
+            response = client.post(endpoint, json=request_data)
+            result_key = "interpolated_values"
+        else:
+            request_data = {
+                "intervals": PLANE_INTERVALS,
+                "query_points": query_points,
+                "fitting_accuracy": 0.01,
+            }
+            response = client.post(endpoint, json=request_data, headers=auth_headers)
+            result_key = "values"
 
-class TestRBFInterpolation:
-    """Tests for /rbf/interpolate endpoint."""
-
-    def test_simple_2d_interpolation(self, client):
-        """Test basic 2D RBF interpolation with 4 corner points forming a plane."""
-        # Create a simple plane: z = x + y
-        # Corner points: (0,0)=0, (1,0)=1, (0,1)=1, (1,1)=2
-        request_data = {
-            "training_points": [[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
-            "training_values": [0.0, 1.0, 1.0, 2.0],
-            "test_points": [[0.5, 0.5]],
-        }
-
-        response = client.post("/rbf/interpolate", json=request_data)
         assert response.status_code == 200
 
         data = response.json()
-        assert "interpolated_values" in data
-        assert len(data["interpolated_values"]) == 1
-
-        # For a plane z = x + y, the value at (0.5, 0.5) should be close to 1.0
-        interpolated_value = data["interpolated_values"][0]
-        assert abs(interpolated_value - 1.0) < 0.1, f"Expected ~1.0, got {interpolated_value}"
-
-    def test_multiple_test_points(self, client):
-        """Test interpolation at multiple test points simultaneously."""
-        request_data = {
-            "training_points": [[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
-            "training_values": [0.0, 1.0, 1.0, 2.0],
-            "test_points": [[0.5, 0.5], [0.25, 0.25], [0.75, 0.75]],
-        }
-
-        response = client.post("/rbf/interpolate", json=request_data)
-        assert response.status_code == 200
-
-        data = response.json()
-        assert len(data["interpolated_values"]) == 3
-
-        # All values should be reasonable for z = x + y
-        for value in data["interpolated_values"]:
-            assert 0.0 <= value <= 2.0
-
-    def test_exact_interpolation_at_training_points(self, client):
-        """RBF should exactly reproduce training values at training point locations."""
-        training_points = [[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [1.0, 1.0]]
-        training_values = [0.0, 1.0, 1.0, 2.0]
-
-        request_data = {
-            "training_points": training_points,
-            "training_values": training_values,
-            "test_points": training_points,  # Test at same locations
-        }
-
-        response = client.post("/rbf/interpolate", json=request_data)
-        assert response.status_code == 200
+        if endpoint == "/rbf/evaluate":
+            assert len(data["extents"]) == 6
+        values = data[result_key]
+        assert len(values) == len(expected)
+        for i, (value, target) in enumerate(zip(values, expected)):
+            assert abs(value - target) <= tolerance, \
+                f"Point {i}: expected {target}, got {value}"
+
+
+class TestConcurrentRequests:
+    """Independent happy-path requests served concurrently by one app."""
+
+    @pytest.mark.anyio
+    async def test_happy_paths_concurrently(self, async_client, auth_headers):
+        requests = [
+            ("/rbf/interpolate", PLANE_INTERPOLATE_BODY),
+            ("/rbf/evaluate", PLANE_EVALUATE_BODY),
+            ("/v2/rbf/evaluate", PLANE_EVALUATE_V2_BODY),
+            ("/rbf/coefficients", PLANE_COEFFICIENTS_BODY),
+        ]
+        responses = [None] * len(requests)
+
+        async def post(index, path, body):
+            responses[index] = await async_client.post(
+                path, content=body, headers={**auth_headers, **JSON_HEADERS}
+            )
+
+        async with anyio.create_task_group() as tg:
+            for index, (path, body) in enumerate(requests):
+                tg.start_soon(post, index, path, body)
+
+        assert [response.status_code for response in responses] == [200] * 4
+        interpolated = [
+            responses[0].json()["interpolated_values"][0],
+            responses[1].json()["values"][0],
+            responses[2].json()["values"][0],
+        ]
+        for value in interpolated:
+            assert abs(value - 1.0) < 0.1
 
-        data = response.json()
-        interpolated = data["interpolated_values"]
 
-        # Should match training values closely (within numerical precision)
-        for i, expected in enumerate(training_values):
-            assert abs(interpolated[i] - expected) < 1e-6, \
-                f"Point {i}: expected {expected}, got {interpolated[i]}"
+class TestRBFInterpolation:
+    """Tests for /rbf/interpolate endpoint."""
 
     def test_mismatched_training_dimensions_returns_error(self, client):
         """Training points and values must have matching counts."""
@@ -93,72 +177,175 @@ class TestRBFInterpolation:
         response = client.post("/rbf/interpolate", json=request_data)
         assert response.status_code == 422 or response.status_code == 500
 
-    def test_endpoint_accessible_without_auth(self, client):
-        """RBF endpoint should be public (no authentication required)."""
+    def test_ragged_training_points_returns_422(self, client):
+        """Rows of different lengths are rejected during request validation."""
         request_data = {
-            "training_points": [[0.0, 0.0], [1.0, 1.0]],
+            "training_points": [[0.0, 0.0], [1.0]],
             "training_values": [0.0, 1.0],
             "test_points": [[0.5, 0.5]],
         }
 
-        # No Authorization header
         response = client.post("/rbf/interpolate", json=request_data)
-        assert response.status_code == 200
-
-
-class TestRBFCoefficientsEndpoint:
-    """Tests for /rbf/coefficients endpoint (authenticated)."""
+        assert response.status_code == 422
 
-    def test_coefficients_requires_auth(self, client):
-        """Endpoint should return 401/403 when no API key is provided."""
+    def test_null_training_value_returns_422(self, client):
+        """null is not a number, even though NumPy would read it as NaN."""
         request_data = {
-            "intervals": [
-                {"x": 0.0, "y": 0.0, "z": 0.0, "value": 0.0},
-                {"x": 1.0, "y": 0.0, "z": 0.0, "value": 1.0},
-            ],
-            "fitting_accuracy": 0.01,
+            "training_points": [[0.0, 0.0], [1.0, 0.0]],
+            "training_values": [0.0, None],
+            "test_points": [[0.5, 0.5]],
         }
 
-        # No Authorization header
-        response = client.post("/rbf/coefficients", json=request_data)
-        assert response.status_code in (401, 403)
-
-    def test_coefficients_rejects_wrong_key(self, client):
-        """Endpoint should return 401 for wrong API key."""
-        request_data = {
-            "intervals": [
-                {"x": 0.0, "y": 0.0, "z": 0.0, "value": 0.0},
-                {"x": 1.0, "y": 0.0, "z": 0.0, "value": 1.0},
-            ],
-        }
+        response = client.post("/rbf/interpolate", json=request_data)
+        assert response.status_code == 422
 
+    def test_malformed_json_returns_422(self, client):
+        """Bodies that orjson cannot parse are reported as validation errors."""
         response = client.post(
-            "/rbf/coefficients",
-            json=request_data,
-            headers={"Authorization": "Bearer wrong-key"},
+            "/rbf/interpolate",
+            content=b'{"training_points": [[0.0, 0.0],',
+            headers={"content-type": "application/json"},
         )
-        assert response.status_code == 401
+        assert response.status_code == 422
 
-    def test_coefficients_with_valid_auth(self, client, auth_headers):
-        """Returns coefficients when valid API key is provided."""
+    def test_endpoint_accessible_without_auth(self, client):
+        """RBF endpoint should be public (no authentication required)."""
         request_data = {
-            "intervals": [
-                {"x": 0.0, "y": 0.0, "z": 0.0, "value": 0.0},
-                {"x": 1.0, "y": 0.0, "z": 0.0, "value": 1.0},
-                {"x": 0.0, "y": 1.0, "z": 0.0, "value": 1.0},
-                {"x": 1.0, "y": 1.0, "z": 0.0, "value": 2.0},
-            ],
-            "fitting_accuracy": 0.01,
+            "training_points": [[0.0, 0.0], [1.0, 1.0]],
+            "training_values": [0.0, 1.0],
+            "test_points": [[0.5, 0.5]],
         }
 
-        response = client.post(
-            "/rbf/coefficients",
-            json=request_data,
-            headers=auth_headers,
-        )
+        # No Authorization header
+        response = client.post("/rbf/interpolate", json=request_data)
         assert response.status_code == 200
 
-        data = response.json()
+
+def _post_coefficients(client, auth_headers, intervals, fitting_accuracy):
+    """POST /rbf/coefficients with a body serialized through the request model."""
+    body = RBFCoefficientsRequest(
+        intervals=intervals, fitting_accuracy=fitting_accuracy
+    ).model_dump_json().encode()
+    return client.post(
+        "/rbf/coefficients",
+        content=body,
+        headers={**auth_headers, **JSON_HEADERS},
+    )
+
+
+# Coefficient responses are fitted once per module and shared by the tests
+# that only assert on them (the endpoint is deterministic for a given request)
+@pytest.fixture(scope="module")
+def plane_coefficients(_app_client, auth_headers):
+    """/rbf/coefficients response for the x + y plane."""
+    return _post_coefficients(_app_client, auth_headers, PLANE_INTERVALS, 0.01)
+
+
+@pytest.fixture(scope="module")
+def spatial_coefficients(_app_client, auth_headers):
+    """/rbf/coefficients response for realistic UTM coordinates."""
+    intervals = [
+        {"x": 500000.0, "y": 4500000.0, "z": 100.0, "value": 0.0},
+        {"x": 501000.0, "y": 4500000.0, "z": 100.0, "value": 1.0},
+        {"x": 500000.0, "y": 4501000.0, "z": 150.0, "value": 1.0},
+        {"x": 501000.0, "y": 4501000.0, "z": 150.0, "value": 2.0},
+    ]
+    return _post_coefficients(_app_client, auth_headers, intervals, 0.01)
+
+
+@pytest.fixture(scope="module", params=[0.01, 0.001], ids=["default", "higher"])
+def accuracy_coefficients(request, _app_client, auth_headers):
+    """/rbf/coefficients response for three intervals at each fitting_accuracy."""
+    intervals = [
+        {"x": 0.0, "y": 0.0, "z": 0.0, "value": 0.0},
+        {"x": 1.0, "y": 0.0, "z": 0.0, "value": 1.0},
+        {"x": 0.0, "y": 1.0, "z": 0.0, "value": 1.0},
+    ]
+    return _post_coefficients(_app_client, auth_headers, intervals, request.param)
+
+
+# Minimal valid bodies for each authenticated RBF endpoint
+PROTECTED_ENDPOINTS = [
+    pytest.param(
+        "/rbf/coefficients", {"intervals": PLANE_INTERVALS}, id="coefficients"
+    ),
+    pytest.param("/rbf/model", {"intervals": PLANE_INTERVALS}, id="model"),
+    pytest.param(
+        "/rbf/evaluate",
+        {
+            "intervals": PLANE_INTERVALS,
+            "query_points": [{"x": 0.5, "y": 0.5, "z": 0.0}],
+        },
+        id="evaluate",
+    ),
+    pytest.param(
+        "/v2/rbf/evaluate",
+        {
+            "intervals_xyzv": [
+                [i["x"], i["y"], i["z"], i["value"]] for i in PLANE_INTERVALS
+            ],
+            "query_xyz": [[0.5, 0.5, 0.0]],
+        },
+        id="evaluate-v2",
+    ),
+]
+
+
+class TestProtectedRBFEndpoints:
+    """Auth and request validation shared by every authenticated RBF endpoint."""
+
+    @pytest.mark.parametrize(("endpoint", "request_data"), PROTECTED_ENDPOINTS)
+    @pytest.mark.parametrize(
+        ("headers", "expected_statuses"),
+        [
+            pytest.param({}, (401, 403), id="missing-key"),
+            pytest.param(
+                {"Authorization": "Bearer wrong-key"}, (401,), id="wrong-key"
+            ),
+        ],
+    )
+    def test_rejects_without_valid_key(
+        self, client, endpoint, request_data, headers, expected_statuses
+    ):
+        """Endpoint should return 401 (or 403 with no header) without a valid key."""
+        response = client.post(endpoint, json=request_data, headers=headers)
+        assert response.status_code in expected_statuses
+
+    @pytest.mark.parametrize(
+        ("endpoint", "request_data"),
+        [
+            pytest.param(
+                "/rbf/coefficients",
+                {"intervals": [], "fitting_accuracy": 0.01},
+                id="coefficients",
+            ),
+            pytest.param("/rbf/model", {"intervals": []}, id="model"),
+            pytest.param(
+                "/rbf/evaluate",
+                {"intervals": [], "query_points": [{"x": 0.5, "y": 0.5, "z": 0.0}]},
+                id="evaluate",
+            ),
+            pytest.param(
+                "/v2/rbf/evaluate",
+                {"intervals_xyzv": [], "query_xyz": [[0.5, 0.5, 0.0]]},
+                id="evaluate-v2",
+            ),
+        ],
+    )
+    def test_rejects_empty_intervals(self, client, auth_headers, endpoint, request_data):
+        """Endpoint should return 422 for empty training data."""
+        response = client.post(endpoint, json=request_data, headers=auth_headers)
+        assert response.status_code == 422
+
+
+class TestRBFCoefficientsEndpoint:
+    """Tests for /rbf/coefficients endpoint (authenticated)."""
+
+    def test_coefficients_with_valid_auth(self, plane_coefficients):
+        """Returns coefficients when valid API key is provided."""
+        assert plane_coefficients.status_code == 200
+
+        data = plane_coefficients.json()
         # Verify response structure
         assert "source_points" in data
         assert "point_coefficients" in data
@@ -174,26 +361,56 @@ class TestRBFCoefficientsEndpoint:
         # Verify extents is [min_x, min_y, min_z, max_x, max_y, max_z]
         assert len(data["extents"]) == 6
 
-    def test_coefficients_with_3d_spatial_data(self, client, auth_headers):
-        """Test with realistic 3D geological coordinates."""
-        request_data = {
-            "intervals": [
-                {"x": 500000.0, "y": 4500000.0, "z": 100.0, "value": 0.0},
-                {"x": 501000.0, "y": 4500000.0, "z": 100.0, "value": 1.0},
-                {"x": 500000.0, "y": 4501000.0, "z": 150.0, "value": 1.0},
-                {"x": 501000.0, "y": 4501000.0, "z": 150.0, "value": 2.0},
-            ],
-            "fitting_accuracy": 0.01,
-        }
-
+    def test_coefficients_as_msgpack(self, client, auth_headers, plane_coefficients):
+        """Accept: application/x-msgpack returns the same fields as MessagePack."""
         response = client.post(
             "/rbf/coefficients",
-            json=request_data,
-            headers=auth_headers,
+            content=PLANE_COEFFICIENTS_BODY,
+            headers={
+                **auth_headers,
+                **JSON_HEADERS,
+                "Accept": "application/x-msgpack",
+            },
         )
         assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-msgpack"
+
+        data = ormsgpack.unpackb(response.content)
+        assert data == plane_coefficients.json()
+
+    @pytest.mark.parametrize(
+        ("accept", "content_type"),
+        [
+            ("application/json, application/x-msgpack;q=0.5", "application/json"),
+            ("application/json;q=0.5, application/x-msgpack", "application/x-msgpack"),
+            ("*/*;q=0.1, application/x-msgpack", "application/x-msgpack"),
+            ("application/x-msgpack, application/*", "application/json"),
+            ("Application/X-MsgPack; q=1", "application/x-msgpack"),
+            ("application/x-msgpack;q=0", "application/json"),
+            ("application/x-msgpack;q=0.0, application/json", "application/json"),
+            ("application/x-msgpack;q=inf", "application/json"),
+            ("application/x-msgpack;q=2", "application/json"),
+            ("application/x-msgpack-extra", "application/json"),
+            ("*/*", "application/json"),
+        ],
+    )
+    def test_coefficients_accept_negotiation(
+        self, client, auth_headers, accept, content_type
+    ):
+        """MessagePack only when it outranks JSON and its wildcards by q."""
+        response = client.post(
+            "/rbf/coefficients",
+            content=PLANE_COEFFICIENTS_BODY,
+            headers={**auth_headers, **JSON_HEADERS, "Accept": accept},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == content_type
 
-        data = response.json()
+    def test_coefficients_with_3d_spatial_data(self, spatial_coefficients):
+        """Test with realistic 3D geological coordinates."""
+        assert spatial_coefficients.status_code == 200
+
+        data = spatial_coefficients.json()
         assert len(data["source_points"]) == 4
         assert len(data["extents"]) == 6
 
@@ -201,141 +418,60 @@ class TestRBFCoefficientsEndpoint:
         assert data["extents"][0] == 500000.0  # min_x
         assert data["extents"][3] == 501000.0  # max_x
 
-    def test_coefficients_rejects_empty_intervals(self, client, auth_headers):
-        """Endpoint should return 422 for empty intervals."""
-        request_data = {
-            "intervals": [],
-            "fitting_accuracy": 0.01,
-        }
-
-        response = client.post(
-            "/rbf/coefficients",
-            json=request_data,
-            headers=auth_headers,
-        )
-        # Pydantic validation error for min_length=1
-        assert response.status_code == 422
-
-    def test_coefficients_with_custom_fitting_accuracy(self, client, auth_headers):
+    def test_coefficients_with_custom_fitting_accuracy(self, accuracy_coefficients):
         """Test custom fitting_accuracy parameter."""
-        request_data = {
-            "intervals": [
-                {"x": 0.0, "y": 0.0, "z": 0.0, "value": 0.0},
-                {"x": 1.0, "y": 0.0, "z": 0.0, "value": 1.0},
-                {"x": 0.0, "y": 1.0, "z": 0.0, "value": 1.0},
-            ],
-            "fitting_accuracy": 0.001,  # Higher accuracy
-        }
+        assert accuracy_coefficients.status_code == 200
+        assert len(accuracy_coefficients.json()["source_points"]) == 3
 
-        response = client.post(
-            "/rbf/coefficients",
-            json=request_data,
-            headers=auth_headers,
-        )
-        assert response.status_code == 200
 
+class TestRBFModelEndpoint:
+    """Tests for /rbf/model endpoint (authenticated)."""
 
-class TestRBFEvaluateEndpoint:
-    """Tests for /rbf/evaluate endpoint (authenticated)."""
-
-    def test_evaluate_requires_auth(self, client):
-        """Endpoint should return 401/403 when no API key is provided."""
-        request_data = {
-            "intervals": [
-                {"x": 0.0, "y": 0.0, "z": 0.0, "value": 0.0},
-                {"x": 1.0, "y": 0.0, "z": 0.0, "value": 1.0},
-            ],
-            "query_points": [
-                {"x": 0.5, "y": 0.0, "z": 0.0},
-            ],
-        }
-
-        # No Authorization header
-        response = client.post("/rbf/evaluate", json=request_data)
-        assert response.status_code in (401, 403)
-
-    def test_evaluate_rejects_wrong_key(self, client):
-        """Endpoint should return 401 for wrong API key."""
-        request_data = {
-            "intervals": [
-                {"x": 0.0, "y": 0.0, "z": 0.0, "value": 0.0},
-                {"x": 1.0, "y": 0.0, "z": 0.0, "value": 1.0},
-            ],
-            "query_points": [
-                {"x": 0.5, "y": 0.0, "z": 0.0},
-            ],
-        }
-
-        response = client.post(
-            "/rbf/evaluate",
-            json=request_data,
-            headers={"Authorization": "Bearer wrong-key"},
-        )
-        assert response.status_code == 401
-
-    def test_evaluate_with_valid_auth(self, client, auth_headers):
-        """Returns interpolated values when valid API key is provided."""
-        # Create a simple plane: value = x + y
-        request_data = {
-            "intervals": [
-                {"x": 0.0, "y": 0.0, "z": 0.0, "value": 0.0},
-                {"x": 1.0, "y": 0.0, "z": 0.0, "value": 1.0},
-                {"x": 0.0, "y": 1.0, "z": 0.0, "value": 1.0},
-                {"x": 1.0, "y": 1.0, "z": 0.0, "value": 2.0},
-            ],
-            "query_points": [
-                {"x": 0.5, "y": 0.5, "z": 0.0},
-            ],
-            "fitting_accuracy": 0.01,
-        }
+    REQUEST_DATA = {
+        "intervals": [
+            {"x": 0.0, "y": 0.0, "z": 0.0, "value": 0.0},
+            {"x": 1.0, "y": 0.0, "z": 0.0, "value": 1.0},
+            {"x": 0.0, "y": 1.0, "z": 0.0, "value": 1.0},
+        ],
+        "fitting_accuracy": 0.01,
+    }
 
+    def test_model_returns_saved_model_json(self, client, auth_headers):
+        """Returns ferreus_rbf's saved model JSON unchanged."""
         response = client.post(
-            "/rbf/evaluate",
-            json=request_data,
-            headers=auth_headers,
+            "/rbf/model", json=self.REQUEST_DATA, headers=auth_headers
         )
         assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
 
         data = response.json()
-        assert "values" in data
-        assert "extents" in data
+        assert "points" in data
+        assert "coefficients" in data
+        assert data["points"]["nrows"] == 3
 
-        # Should have one value for one query point
-        assert len(data["values"]) == 1
 
-        # For plane value = x + y, at (0.5, 0.5) should be close to 1.0
-        interpolated_value = data["values"][0]
-        assert abs(interpolated_value - 1.0) < 0.1
+class TestRBFEvaluateEndpoint:
+    """Tests for /rbf/evaluate endpoint (authenticated)."""
 
-    def test_evaluate_multiple_query_points(self, client, auth_headers):
-        """Test evaluation at multiple query points."""
-        request_data = {
-            "intervals": [
-                {"x": 0.0, "y": 0.0, "z": 0.0, "value": 0.0},
-                {"x": 1.0, "y": 0.0, "z": 0.0, "value": 1.0},
-                {"x": 0.0, "y": 1.0, "z": 0.0, "value": 1.0},
-                {"x": 1.0, "y": 1.0, "z": 0.0, "value": 2.0},
-            ],
-            "query_points": [
-                {"x": 0.5, "y": 0.5, "z": 0.0},
-                {"x": 0.25, "y": 0.25, "z": 0.0},
-                {"x": 0.75, "y": 0.75, "z": 0.0},
-            ],
-        }
+    def test_evaluate_through_ferreus_rbf(self, client, auth_headers, monkeypatch):
+        """Above the direct-solver limits the endpoint fits with ferreus_rbf."""
+        monkeypatch.setattr("app.rbf_service.use_direct_solver", lambda *args: False)
 
+        def fail_direct(*args):
+            raise AssertionError("direct solver should not be used")
+
+        monkeypatch.setattr("app.rbf_service.fit_and_evaluate_linear_rbf", fail_direct)
         response = client.post(
             "/rbf/evaluate",
-            json=request_data,
-            headers=auth_headers,
+            content=PLANE_EVALUATE_BODY,
+            headers={**auth_headers, **JSON_HEADERS},
         )
         assert response.status_code == 200
 
         data = response.json()
-        assert len(data["values"]) == 3
-
-        # All values should be reasonable for value = x + y
-        for value in data["values"]:
-            assert 0.0 <= value <= 2.0
+        assert len(data["values"]) == 1
+        assert abs(data["values"][0] - 1.0) <= 0.1
+        assert data["extents"] == [0.0, 0.0, 0.0, 1.0, 1.0, 0.0]
 
     def test_evaluate_with_3d_spatial_data(self, client, auth_headers):
         """Test with realistic 3D geological coordinates."""
@@ -363,22 +499,6 @@ class TestRBFEvaluateEndpoint:
         assert len(data["values"]) == 1
         assert len(data["extents"]) == 6
 
-    def test_evaluate_rejects_empty_intervals(self, client, auth_headers):
-        """Endpoint should return 422 for empty intervals."""
-        request_data = {
-            "intervals": [],
-            "query_points": [
-                {"x": 0.5, "y": 0.5, "z": 0.0},
-            ],
-        }
-
-        response = client.post(
-            "/rbf/evaluate",
-            json=request_data,
-            headers=auth_headers,
-        )
-        assert response.status_code == 422
-
     def test_evaluate_rejects_empty_query_points(self, client, auth_headers):
         """Endpoint should return 422 for empty query points."""
         request_data = {
@@ -396,38 +516,327 @@ class TestRBFEvaluateEndpoint:
         )
         assert response.status_code == 422
 
-    def test_evaluate_exact_at_training_points(self, client, auth_headers):
-        """RBF should exactly reproduce training values at training point locations."""
+    def test_evaluate_multiple_value_channels(self, client, auth_headers):
+        """List values fit all channels together; each matches a scalar fit."""
+        points = [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (1.0, 1.0, 0.5)]
+        gold = [0.0, 1.0, 1.0, 2.0]
+        copper = [3.0, 1.0, 4.0, 1.5]
+        query_points = [{"x": 0.5, "y": 0.5, "z": 0.1}, {"x": 0.2, "y": 0.7, "z": 0.3}]
+
+        def evaluate(values):
+            intervals = [
+                {"x": x, "y": y, "z": z, "value": value}
+                for (x, y, z), value in zip(points, values)
+            ]
+            return client.post(
+                "/rbf/evaluate",
+                json={"intervals": intervals, "query_points": query_points},
+                headers=auth_headers,
+            )
+
+        response = evaluate([list(pair) for pair in zip(gold, copper)])
+        assert response.status_code == 200
+        values = np.array(response.json()["values"])
+        assert values.shape == (2, 2)
+
+        np.testing.assert_allclose(
+            values[:, 0], evaluate(gold).json()["values"], atol=1e-6
+        )
+        np.testing.assert_allclose(
+            values[:, 1], evaluate(copper).json()["values"], atol=1e-6
+        )
+
+    def test_evaluate_rejects_inconsistent_value_channels(self, client, auth_headers):
+        """Intervals must all use scalars, or lists of one length."""
+        query_points = [{"x": 0.5, "y": 0.5, "z": 0.0}]
+        mixed = "Interval values must all be numbers or all be lists"
+        ragged = "Interval value lists must all have the same length"
+        for values, detail in (
+            ([1.0, [1.0]], mixed),
+            ([1.0, [1.0, 2.0]], mixed),
+            ([[1.0, 2.0], 1.0], mixed),
+            ([[1.0, 2.0], [1.0]], ragged),
+        ):
+            intervals = [
+                {"x": float(i), "y": 0.0, "z": 0.0, "value": value}
+                for i, value in enumerate(values)
+            ]
+            response = client.post(
+                "/rbf/evaluate",
+                json={"intervals": intervals, "query_points": query_points},
+                headers=auth_headers,
+            )
+            assert response.status_code == 422, values
+            assert response.json()["detail"] == detail, values
+
+
+class TestRBFEvaluateV2Endpoint:
+    """Tests for /v2/rbf/evaluate endpoint (authenticated, columnar input)."""
+
+    def test_evaluate_v2_matches_object_endpoint(self, client, auth_headers):
+        """Columnar input returns the same values as /rbf/evaluate."""
         intervals = [
             {"x": 0.0, "y": 0.0, "z": 0.0, "value": 0.0},
             {"x": 1.0, "y": 0.0, "z": 0.0, "value": 1.0},
             {"x": 0.0, "y": 1.0, "z": 0.0, "value": 1.0},
             {"x": 1.0, "y": 1.0, "z": 0.0, "value": 2.0},
         ]
-
-        # Query at the same locations as training data
         query_points = [
-            {"x": interval["x"], "y": interval["y"], "z": interval["z"]}
-            for interval in intervals
+            {"x": 0.5, "y": 0.5, "z": 0.0},
+            {"x": 0.25, "y": 0.75, "z": 0.0},
         ]
 
+        v1 = client.post(
+            "/rbf/evaluate",
+            json={"intervals": intervals, "query_points": query_points},
+            headers=auth_headers,
+        )
+        v2 = client.post(
+            "/v2/rbf/evaluate",
+            json={
+                "intervals_xyzv": [[i["x"], i["y"], i["z"], i["value"]] for i in intervals],
+                "query_xyz": [[q["x"], q["y"], q["z"]] for q in query_points],
+            },
+            headers=auth_headers,
+        )
+        assert v1.status_code == 200
+        assert v2.status_code == 200
+        assert v2.json() == v1.json()
+        assert abs(v2.json()["values"][0] - 1.0) < 0.1
+
+    def test_evaluate_v2_rejects_wrong_column_count(self, client, auth_headers):
+        """Training rows must be [x, y, z, value]."""
         request_data = {
-            "intervals": intervals,
-            "query_points": query_points,
+            "intervals_xyzv": [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]],
+            "query_xyz": [[0.5, 0.0, 0.0]],
         }
 
         response = client.post(
-            "/rbf/evaluate",
+            "/v2/rbf/evaluate",
+            json=request_data,
+            headers=auth_headers,
+        )
+        assert response.status_code == 422
+
+    def test_evaluate_v2_rejects_empty_query_points(self, client, auth_headers):
+        """Endpoint should return 422 for empty query rows."""
+        request_data = {
+            "intervals_xyzv": [[0.0, 0.0, 0.0, 0.0], [1.0, 0.0, 0.0, 1.0]],
+            "query_xyz": [],
+        }
+
+        response = client.post(
+            "/v2/rbf/evaluate",
             json=request_data,
             headers=auth_headers,
         )
+        assert response.status_code == 422
+
+
+@pytest.mark.usefixtures("fresh_model_cache")
+class TestModelCache:
+    """Fitted models are reused for identical training data."""
+
+    def test_identical_training_data_reuses_fitted_model(self):
+        points = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+        values = np.array([[0.0], [1.0], [1.0]])
+
+        first, _ = fit_rbf_from_arrays(points, values, 0.01)
+        second, _ = fit_rbf_from_arrays(points.copy(), values.copy(), 0.01)
+        assert second is first
+
+    def test_different_accuracy_or_values_refits(self):
+        points = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+        values = np.array([[0.0], [1.0], [1.0]])
+
+        first, _ = fit_rbf_from_arrays(points, values, 0.01)
+        assert fit_rbf_from_arrays(points, values, 0.001)[0] is not first
+        assert fit_rbf_from_arrays(points, values + 1.0, 0.01)[0] is not first
+
+    def test_queries_inside_and_outside_extents(self, monkeypatch):
+        """Cached models evaluate queries both inside and beyond their extents."""
+        monkeypatch.setattr("app.rbf_service.use_direct_solver", lambda *args: False)
+        points = np.array([[0.0, 0.0, 0.0], [2.0, 0.0, 0.0], [0.0, 2.0, 0.0]])
+        values = np.array([[0.0], [2.0], [2.0]])
+
+        inside, _ = evaluate_arrays_at_query_points(
+            points, values, np.array([[1.0, 0.0, 0.0]]), 0.01
+        )
+        outside, _ = evaluate_arrays_at_query_points(
+            points, values, np.array([[3.0, 0.0, 0.0]]), 0.01
+        )
+        assert len(inside) == 1
+        assert len(outside) == 1
+
+    def test_chunked_evaluation_matches_single_call(self, monkeypatch):
+        """Splitting queries across evaluate_targets() calls gives the same values."""
+        monkeypatch.setattr("app.rbf_service.use_direct_solver", lambda *args: False)
+        points = np.array([[0.0, 0.0, 0.0], [2.0, 0.0, 0.0], [0.0, 2.0, 1.0]])
+        values = np.array([[0.0], [2.0], [2.0]])
+        query = np.random.default_rng(0).random((7, 3))
+
+        single, _ = evaluate_arrays_at_query_points(points, values, query, 0.01)
+        monkeypatch.setattr("app.rbf_service._EVALUATE_CHUNK_POINTS", 3)
+        chunked, _ = evaluate_arrays_at_query_points(points, values, query, 0.01)
+
+        np.testing.assert_allclose(chunked, single, rtol=1e-12)
+
+    def test_multi_channel_values_through_ferreus_rbf(self, monkeypatch):
+        """K value channels come back as M x K from the fitted-model path."""
+        monkeypatch.setattr("app.rbf_service.use_direct_solver", lambda *args: False)
+        points = np.array([[0.0, 0.0, 0.0], [2.0, 0.0, 0.0], [0.0, 2.0, 1.0]])
+        values = np.array([[0.0, 5.0], [2.0, 4.0], [2.0, 3.0]])
+        query = np.array([[0.5, 0.5, 0.5], [3.0, 0.0, 0.0]])
+
+        result, _ = evaluate_arrays_at_query_points(points, values, query, 0.01)
+        assert result.shape == (2, 2)
+
+
+@pytest.mark.usefixtures("fresh_model_cache")
+class TestSharedModelCache:
+    """Fitted models shared across workers through RBF_MODEL_CACHE_DIR."""
+
+    POINTS = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    VALUES = np.array([[0.0], [1.0], [1.0]])
+
+    def test_other_worker_loads_saved_model(self, tmp_path, monkeypatch):
+        fit_rbf_from_arrays(self.POINTS, self.VALUES, 0.01, str(tmp_path))
+        assert len(list(tmp_path.glob("*.json"))) == 1
+
+        # A fresh worker (empty in-process cache) loads instead of fitting
+        clear_model_cache()
+
+        def fail_fit(*args, **kwargs):
+            raise AssertionError("model should have been loaded, not refitted")
+
+        monkeypatch.setattr("app.rbf_service._interpolant_settings", fail_fit)
+        rbf, extents = fit_rbf_from_arrays(
+            self.POINTS, self.VALUES, 0.01, str(tmp_path)
+        )
+        np.testing.assert_array_equal(rbf.source_points(), self.POINTS)
+        np.testing.assert_array_equal(extents, [0.0, 0.0, 0.0, 1.0, 1.0, 0.0])
+
+    def test_unset_directory_writes_nothing(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        fit_rbf_from_arrays(self.POINTS, self.VALUES, 0.01)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_endpoint_uses_configured_directory(
+        self, client, auth_headers, tmp_path, monkeypatch
+    ):
+        settings = type("MockSettings", (), {"rbf_model_cache_dir": str(tmp_path)})()
+        monkeypatch.setattr("app.main.get_settings", lambda: settings)
+        response = _post_coefficients(client, auth_headers, PLANE_INTERVALS, 0.001)
         assert response.status_code == 200
+        assert len(list(tmp_path.glob("*.json"))) == 1
+
+    def test_stale_temp_files_are_pruned(self, tmp_path):
+        stale = tmp_path / "crashed.tmp"
+        fresh = tmp_path / "in-progress.tmp"
+        stale.write_text("")
+        fresh.write_text("")
+        # Older than any save in progress could be
+        old = time.time() - 24 * 60 * 60
+        os.utime(stale, (old, old))
+        fit_rbf_from_arrays(self.POINTS, self.VALUES, 0.01, str(tmp_path))
+        assert not stale.exists()
+        assert fresh.exists()
+
+
+@pytest.mark.usefixtures("fresh_model_cache")
+class TestModelSerialization:
+    """Saving fitted models for coefficient extraction."""
+
+    def test_tempfile_fallback_matches_in_memory_save(self, monkeypatch):
+        points = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+        values = np.array([[0.0], [1.0], [1.0]])
+        rbf, _ = fit_rbf_from_arrays(points, values, 0.01)
+
+        in_memory = extract_coefficients(rbf)
+        monkeypatch.setattr("app.rbf_service._memfd_supported", lambda: False)
+        assert extract_coefficients(rbf) == in_memory
+
+
+class TestDirectLinearRBF:
+    """Direct dense solver used for small /rbf/interpolate problems."""
+
+    PLANE_POINTS = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+    PLANE_VALUES = np.array([[0.0], [1.0], [1.0], [2.0]])
+
+    def test_reproduces_training_values(self):
+        weights, drift = fit_linear_rbf(self.PLANE_POINTS, self.PLANE_VALUES)
+        values = evaluate_linear_rbf(self.PLANE_POINTS, weights, drift, self.PLANE_POINTS)
+        np.testing.assert_allclose(values, self.PLANE_VALUES, atol=1e-12)
+
+    def test_plane_midpoint(self):
+        weights, drift = fit_linear_rbf(self.PLANE_POINTS, self.PLANE_VALUES)
+        values = evaluate_linear_rbf(
+            self.PLANE_POINTS, weights, drift, np.array([[0.5, 0.5]])
+        )
+        assert values.shape == (1, 1)
+        assert abs(values[0, 0] - 1.0) < 1e-12
+
+    def test_fit_and_evaluate_matches_separate_calls(self):
+        targets = np.array([[0.5, 0.5], [0.1, 0.9]])
+        weights, drift = fit_linear_rbf(self.PLANE_POINTS, self.PLANE_VALUES)
+        np.testing.assert_array_equal(
+            fit_and_evaluate_linear_rbf(self.PLANE_POINTS, self.PLANE_VALUES, targets),
+            evaluate_linear_rbf(self.PLANE_POINTS, weights, drift, targets),
+        )
 
-        data = response.json()
-        interpolated = data["values"]
+    def test_duplicate_points_are_singular(self):
+        points = np.array([[0.0, 0.0], [0.0, 0.0], [1.0, 1.0]])
+        with pytest.raises(np.linalg.LinAlgError):
+            fit_linear_rbf(points, np.array([[0.0], [0.0], [1.0]]))
+
+    def test_matches_ferreus_rbf_path(self, client, monkeypatch):
+        """The endpoint gives the same answer with and without the direct solver."""
+        request_data = {
+            "training_points": self.PLANE_POINTS.tolist(),
+            "training_values": self.PLANE_VALUES[:, 0].tolist(),
+            "test_points": [[0.5, 0.5], [0.25, 0.75], [0.9, 0.1]],
+        }
+
+        direct = client.post("/rbf/interpolate", json=request_data)
+        monkeypatch.setattr("app.main.use_direct_solver", lambda *args: False)
+        ferreus = client.post("/rbf/interpolate", json=request_data)
+
+        assert direct.status_code == 200
+        assert ferreus.status_code == 200
+        np.testing.assert_allclose(
+            direct.json()["interpolated_values"],
+            ferreus.json()["interpolated_values"],
+            atol=1e-4,
+        )
+
+    def test_tiled_evaluation_matches_untiled(self, monkeypatch):
+        """Evaluating across several row tiles gives the same result as one tile."""
+        rng = np.random.default_rng(0)
+        points = rng.random((10, 3))
+        values = rng.random((10, 2))
+        targets = rng.random((37, 3))
+        weights, drift = fit_linear_rbf(points, values)
+
+        single = evaluate_linear_rbf(points, weights, drift, targets)
+        monkeypatch.setattr("app.rbf_direct._TILE_BYTES", 8 * 10 * 4)
+        tiled = evaluate_linear_rbf(points, weights, drift, targets)
+
+        np.testing.assert_allclose(tiled, single, rtol=0, atol=1e-12)
+
+    @pytest.mark.usefixtures("fresh_model_cache")
+    def test_service_direct_path_matches_ferreus_rbf(self, monkeypatch):
+        """Small /rbf/evaluate problems give the ferreus_rbf answer directly."""
+        points = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.5]])
+        values = np.array([[0.0], [1.0], [1.0]])
+        query = np.array([[0.5, 0.5, 0.1], [0.2, 0.3, 0.4]])
+
+        direct, direct_extents = evaluate_arrays_at_query_points(
+            points, values, query, 0.0001
+        )
+        monkeypatch.setattr("app.rbf_service.use_direct_solver", lambda *args: False)
+        ferreus, ferreus_extents = evaluate_arrays_at_query_points(
+            points, values, query, 0.0001
+        )
 
-        # Should match training values closely (within numerical precision)
-        for i, interval in enumerate(intervals):
-            expected = interval["value"]
-            assert abs(interpolated[i] - expected) < 1e-6, \
-                f"Point {i}: expected {expected}, got {interpolated[i]}"
+        np.testing.assert_allclose(direct, ferreus, atol=1e-3)
+        np.testing.assert_array_equal(direct_extents, ferreus_extents)